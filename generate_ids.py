@@ -1,6 +1,7 @@
-from json import load
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from sys import argv
+
+from ids_common import gen_enum, parse_file
 
 HEAD = """\
 #![allow(deprecated)]
@@ -43,88 +44,16 @@ MIMICS = {
 }
 
 
-def mimic(id, enum):
-	try:
-		id = MIMICS[enum][id]
-	except KeyError:
-		return ""
-	return f'\t#[deprecated(note = "Use `{enum}::{id}` instead.")]\n'
-
-
-def parse_simple(d, data):
-	units = {}
-	for v in data[d]:
-		key = v["name"]
-
-		if not key:
-			continue
-
-		key_to_insert = key.replace(" ", "").replace("_", "").replace("@", "")
-		if key_to_insert[0].isdigit():
-			key_to_insert = "_" + key_to_insert
-		if key_to_insert in units:
-			index = 2
-			tmp = f"{key_to_insert}{index}"
-			while tmp in units:
-				index += 1
-				tmp = f"{key_to_insert}{index}"
-			key_to_insert = tmp
-		key_to_insert = key_to_insert[0].upper() + key_to_insert[1:]
-		units[key_to_insert] = v["id"]
-
-	return units
-
-
-def parse_data(data, version=None):
-	units = parse_simple("Units", data)
-	upgrades = parse_simple("Upgrades", data)
-	effects = parse_simple("Effects", data)
-	buffs = parse_simple("Buffs", data)
-
-	abilities = {}
-	for v in data["Abilities"]:
-		key = v["buttonname"]
-		remapid = v.get("remapid")
-
-		if (not key) and (remapid is None):
-			assert v["buttonname"] == ""
-			continue
-
-		if not key:
-			if v["friendlyname"] != "":
-				key = v["friendlyname"]
-			else:
-				exit(f"Not mapped: {v !r}")
-
-		key = key.replace(" ", "").replace("_", "").replace("@", "")
-		if "name" in v:
-			key = f'{v["name"].replace(" ", "").replace("_", "").replace("@", "")}{key}'
-
-		if "friendlyname" in v:
-			key = v["friendlyname"].replace(" ", "").replace("_", "").replace("@", "")
-
-		if key[0].isdigit():
-			key = "_" + key
-
-		key = key[0].upper() + key[1:]
-		key = key.replace("ResearchResearch", "Research")
-
-		if key in abilities and v["index"] == 0:
-			# print(f"{key} has value 0 and id {v['id']}, overwriting {key}: {abilities[key]}")
-			# Commented out to try to fix: 3670 is not a valid AbilityId
-			abilities[key] = v["id"]
-			pass
-		else:
-			abilities[key] = v["id"]
+def _parse_file(path, version=None):
+	units, abilities, upgrades, buffs, effects = parse_file(path)
 
 	# fixes for wrong ids
 	# if version == "4.10":
 	#   upgrades["EnhancedShockwaves"] = 296
 	#   abilities["GhostAcademyResearchEnhancedShockwaves"] = 822
-	# elif version is None:
 	if version is None:
 		abilities["TerranBuildRefinery"] = 320
-	elif version is "linux505":
+	elif version == "linux505":
 		units["AssimilatorRich"] = 1980
 		units["ExtractorRich"] = 1981
 		units["AccelerationZoneSmall"] = 1985
@@ -136,7 +65,6 @@ def parse_data(data, version=None):
 
 		abilities["FleetBeaconResearchVoidRaySpeedUpgrade"] = 48
 		abilities["FleetBeaconResearchTempestResearchGroundAttackUpgrade"] = 49
-		abilities["FleetBeaconResearchTempestResearchGroundAttackUpgrade"] = 49
 		abilities["GhostAcademyResearchEnhancedShockwaves"] = 822
 		abilities["LurkerDenResearchLurkerRange"] = 3710
 		abilities["BatteryOverchargeBatteryOvercharge"] = 3815
@@ -155,17 +83,6 @@ def parse_data(data, version=None):
 	)
 
 
-def gen_enum(enum, name):
-	return (
-		f"{DERIVES}\npub enum {name} {{\n"
-		+ "".join(
-			mimic(k, name) + f"\t{k} = {v},\n"
-			for k, v in sorted(enum.items(), key=lambda x: x[1])
-		)
-		+ "}\n"
-	)
-
-
 def generate():
 	mod = [
 		[
@@ -177,35 +94,45 @@ def generate():
 		[],
 		["mod impls;"],
 	]
-	enums_latest = parse_data(
-		load((Path.home() / "Documents" / "StarCraft II" / "stableid.json").open())
-	)
-	enums_linux = enums_latest
-	# parse_data(
-	# 	load(
-	# 		(Path.home() / "Documents" / "StarCraft II" / "stableid_4.10.json").open()
-	# 	),
-	# 	version="linux505",
-	# )
-
-	for name, file, enum, enum_linux in zip(
-		ENUM_NAMES, FILE_NAMES, enums_latest, enums_linux
+	sc2_dir = Path.home() / "Documents" / "StarCraft II"
+	latest_path = sc2_dir / "stableid.json"
+	linux_path = sc2_dir / "stableid_4.10.json"
+	if linux_path.exists():
+		# Both parses are CPU-bound on string normalization, so run them
+		# in separate workers.
+		with ProcessPoolExecutor(max_workers=2) as ex:
+			latest_future = ex.submit(_parse_file, latest_path)
+			linux_future = ex.submit(_parse_file, linux_path, "linux505")
+			enums_latest = latest_future.result()
+			enums_linux = linux_future.result()
+	else:
+		enums_latest = _parse_file(latest_path)
+		enums_linux = enums_latest
+
+	sigs_latest = [hash(frozenset(e.items())) for e in enums_latest]
+	if enums_linux is enums_latest:
+		sigs_linux = sigs_latest
+	else:
+		sigs_linux = [hash(frozenset(e.items())) for e in enums_linux]
+
+	for name, file, enum, enum_linux, sig, sig_linux in zip(
+		ENUM_NAMES, FILE_NAMES, enums_latest, enums_linux, sigs_latest, sigs_linux
 	):
-		if enum == enum_linux:
-			generated = f"{HEAD}\n{gen_enum(enum, name)}"
+		generated = bytearray(HEAD.encode("utf-8"))
+		if sig == sig_linux:
+			generated.extend(b"\n")
+			generated.extend(gen_enum(enum, name, DERIVES, MIMICS.get(name)))
 		else:
-			generated = (
-				f'{HEAD}\n#[cfg(target_os = "windows")]\n'
-				+ gen_enum(enum, name)
-				+ '\n#[cfg(target_os = "linux")]\n'
-				+ gen_enum(enum_linux, name)
-			)
-
-		(Path.cwd() / "src" / "ids" / f"{file}.rs").write_text(generated)
+			generated.extend(b'\n#[cfg(target_os = "windows")]\n')
+			generated.extend(gen_enum(enum, name, DERIVES, MIMICS.get(name)))
+			generated.extend(b'\n#[cfg(target_os = "linux")]\n')
+			generated.extend(gen_enum(enum_linux, name, DERIVES, MIMICS.get(name)))
+
+		(Path.cwd() / "src" / "ids" / f"{file}.rs").write_bytes(generated)
 		mod[1].append(f"mod {file};")
 		mod[2].append(f"pub use {file}::{name};")
-	(Path.cwd() / "src" / "ids" / "mod.rs").write_text(
-		"\n\n".join("\n".join(part) for part in mod) + "\n"
+	(Path.cwd() / "src" / "ids" / "mod.rs").write_bytes(
+		("\n\n".join(["\n".join(part) for part in mod]) + "\n").encode("utf-8")
 	)
 
 
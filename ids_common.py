@@ -0,0 +1,128 @@
+"""Shared stableid.json parsing and enum generation for the generate scripts.
+
+Entry points supply their own HEAD/DERIVES/MIMICS constants and apply any
+version-specific id fixups on top of the parsed enums.
+"""
+import pickle
+
+from functools import lru_cache
+from operator import itemgetter
+from pathlib import Path
+
+try:
+	from orjson import loads
+except ImportError:
+	from json import loads
+
+_STRIP = str.maketrans("", "", " _@")
+# Bump when parsing or normalization changes, so stale caches aren't served.
+_CACHE_VERSION = 2
+
+
+@lru_cache(maxsize=None)
+def _norm(s):
+	s = s.translate(_STRIP)
+	if "0" <= s[0] <= "9":
+		s = "_" + s
+	return s[0].upper() + s[1:]
+
+
+def parse_simple(entries):
+	units = {}
+	counts = {}
+	for key, id in entries:
+		if not key:
+			continue
+
+		key_to_insert = _norm(key)
+		if key_to_insert in units:
+			# Start probing at the last used suffix so repeated collisions
+			# stay amortized O(1), but keep the membership check: a suffixed
+			# key may clash with a genuine name like "Reactor2".
+			index = counts.get(key_to_insert, 1) + 1
+			while f"{key_to_insert}{index}" in units:
+				index += 1
+			counts[key_to_insert] = index
+			key_to_insert = f"{key_to_insert}{index}"
+		units[key_to_insert] = id
+
+	return units
+
+
+def parse_data(data):
+	units = parse_simple((v["name"], v["id"]) for v in data["Units"])
+	upgrades = parse_simple((v["name"], v["id"]) for v in data["Upgrades"])
+	effects = parse_simple((v["name"], v["id"]) for v in data["Effects"])
+	buffs = parse_simple((v["name"], v["id"]) for v in data["Buffs"])
+
+	abilities = {}
+	for v in data["Abilities"]:
+		key = v["buttonname"]
+
+		if not key and "remapid" not in v:
+			assert v["buttonname"] == ""
+			continue
+
+		if not key:
+			if v["friendlyname"] != "":
+				key = v["friendlyname"]
+			else:
+				exit(f"Not mapped: {v !r}")
+
+		if "name" in v:
+			key = f'{v["name"]}{key}'
+
+		if "friendlyname" in v:
+			key = v["friendlyname"]
+
+		key = _norm(key).replace("ResearchResearch", "Research")
+
+		if key in abilities and v["index"] == 0:
+			# print(f"{key} has value 0 and id {v['id']}, overwriting {key}: {abilities[key]}")
+			# Commented out to try to fix: 3670 is not a valid AbilityId
+			abilities[key] = v["id"]
+			pass
+		else:
+			abilities[key] = v["id"]
+
+	return (
+		units,
+		abilities,
+		upgrades,
+		buffs,
+		effects,
+	)
+
+
+def parse_file(path):
+	# stableid.json rarely changes, so cache the parsed enums keyed by the
+	# file's mtime and size; a hit skips all parsing and normalization.
+	st = path.stat()
+	cache_dir = Path.home() / ".cache" / "rust-sc2"
+	cache = cache_dir / f"sc2ids_v{_CACHE_VERSION}_{st.st_mtime_ns}_{st.st_size}.pkl"
+	if cache.exists():
+		return pickle.loads(cache.read_bytes())
+
+	enums = parse_data(loads(path.read_bytes()))
+	cache_dir.mkdir(parents=True, exist_ok=True)
+	cache.write_bytes(pickle.dumps(enums))
+	return enums
+
+
+@lru_cache(maxsize=None)
+def _gen_enum(name, items, derives, mimics):
+	items = sorted(items, key=itemgetter(1))
+	fmt = "\t%s = %d,\n"
+	if mimics:
+		mimics = dict(mimics)
+		dep_tpl = f'\t#[deprecated(note = "Use `{name}::{{}}` instead.")]\n'
+		body = "".join(
+			[(dep_tpl.format(mimics[k]) if k in mimics else "") + fmt % (k, v) for k, v in items]
+		)
+	else:
+		body = "".join([fmt % kv for kv in items])
+	return f"{derives}\npub enum {name} {{\n{body}}}\n".encode("utf-8")
+
+
+def gen_enum(enum, name, derives, mimics=None):
+	return _gen_enum(name, tuple(enum.items()), derives, tuple(mimics.items()) if mimics else None)